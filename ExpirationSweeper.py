@@ -0,0 +1,138 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from Metrics import EXPIRATION_SWEEP_ERRORS, EXPIRATION_SWEEP_SECONDS, EXPIRATION_SWEEP_TASKS
+from StorageDB import StorageDB
+from TaskDB import TaskDB, Task, TaskCreate
+
+DAY_SECONDS = 24 * 60 * 60
+
+logger = logging.getLogger(__name__)
+
+class ExpirationSweeper:
+    """Фоновая задача: создает задачи на продажу товаров, срок годности которых подходит к концу.
+
+    Просыпается к ближайшему сроку годности (минус порог) или при добавлении/замене позиции,
+    а не по фиксированному интервалу опроса. Каждый проход смотрит только товары,
+    переступившие порог с прошлого прохода, и замененные позиции. Задача создается один раз
+    на срок годности позиции: удаленную или закрытую менеджером задачу sweeper не повторяет.
+    """
+    def __init__(
+        self,
+        storage_db: StorageDB,
+        task_db: TaskDB,
+        assignee: Callable[[], Optional[str]],
+        within_days: float = 3
+    ):
+        self.storage_db = storage_db
+        self.task_db = task_db
+        self.assignee = assignee
+        self.within_days = within_days
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._swept_until = float("-inf")  # порог, до которого товары уже просмотрены
+        self._dirty: Set[Tuple[str, str]] = set()  # (storage_id, name) для повторной проверки
+        self._emitted: Dict[Tuple[str, str], float] = {}  # (storage_id, name) -> обработанный срок годности
+        storage_db.subscribe_items(self._mark)
+
+    def notify(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _mark(self, storage_id: str, name: str):
+        self._dirty.add((storage_id, name))
+        self.notify()
+
+    def start(self):
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _candidates(self, deadline: float) -> List[Tuple[str, str, float]]:
+        """Товары, переступившие порог с прошлого прохода, и замененные позиции внутри порога,
+        для которых этот срок годности еще не обработан"""
+        keys = self.storage_db.expiring_keys(self._swept_until, deadline)
+        seen = set(keys)
+        keys.extend(key for key in self._dirty if key not in seen)
+        candidates = []
+        for storage_id, name in keys:
+            expiration = self.storage_db.expiration_of(storage_id, name)
+            if expiration is None or expiration > deadline:
+                continue
+            if self._emitted.get((storage_id, name)) != expiration:
+                candidates.append((storage_id, name, expiration))
+        return candidates
+
+    def sweep(self) -> List[Task]:
+        """Создает одной пачкой задачи на продажу для товаров, переступивших порог"""
+        assignee = self.assignee()
+        if not assignee:
+            return []
+
+        deadline = time.time() + self.within_days * DAY_SECONDS
+        candidates = self._candidates(deadline)
+        new_tasks = []
+        for storage_id, name, _ in candidates:
+            if self.task_db.has_open_task(storage_id, name):
+                continue
+            item = self.storage_db.get_record(storage_id, name)
+            storage = self.storage_db.storages.get(storage_id)
+            storage_name = storage.name if storage else storage_id
+            new_tasks.append(TaskCreate(
+                title=f"Срочно продать в {storage_name} ({item.count}) {name}",
+                description=f"Срок годности истекает {item.expiration_date}",
+                assigned_to=assignee,
+                query=json.dumps({
+                    "action": "sell",
+                    "product": name,
+                    "count": item.count,
+                    "storage": storage_id
+                }, ensure_ascii=False, separators=(',', ':'))
+            ))
+        created = self.task_db.create_tasks(new_tasks) if new_tasks else []
+        # Окно сдвигается только после успешного создания задач, иначе следующий проход повторит его
+        self._swept_until = deadline
+        self._dirty.clear()
+        for storage_id, name, expiration in candidates:
+            self._emitted[(storage_id, name)] = expiration
+        return created
+
+    def next_wakeup(self) -> Optional[float]:
+        """Момент, когда следующий товар переступит порог"""
+        threshold = self.within_days * DAY_SECONDS
+        expiration = self.storage_db.next_expiration(time.time() + threshold)
+        if expiration is None:
+            return None
+        return expiration - threshold
+
+    async def _run(self):
+        while True:
+            try:
+                with EXPIRATION_SWEEP_SECONDS.time():
+                    created = self.sweep()
+                if created:
+                    EXPIRATION_SWEEP_TASKS.inc(len(created))
+                    logger.info("Expiration sweep: created %d sell tasks", len(created))
+            except Exception:
+                EXPIRATION_SWEEP_ERRORS.inc()
+                logger.exception("Expiration sweep failed")
+            # sweep синхронный, поэтому сбрасываем только его собственные уведомления
+            self._wakeup.clear()
+
+            wakeup_at = self.next_wakeup()
+            timeout = None if wakeup_at is None else max(wakeup_at - time.time(), 0)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
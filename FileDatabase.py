@@ -1,7 +1,10 @@
 import json
 import os
+import time
 from typing import Dict, Any, Optional
 
+from Metrics import STORE_LOAD_SECONDS, STORE_SAVE_BYTES, STORE_SAVE_SECONDS
+
 class FileDatabase:
     def __init__(self, file_path: str):
         self.file_path = file_path
@@ -9,16 +12,22 @@ class FileDatabase:
         self._load()
 
     def _load(self):
+        started = time.perf_counter()
         if os.path.exists(self.file_path):
             with open(self.file_path, 'r', encoding='utf-8') as f:
                 self.data = json.load(f)
         else:
             self.data = {"users": {}}
             self._save()
+        STORE_LOAD_SECONDS.labels("users").set(time.perf_counter() - started)
 
     def _save(self):
-        with open(self.file_path, 'w', encoding='utf-8') as f:
-            json.dump(self.data, f, indent=2, ensure_ascii=False)
+        started = time.perf_counter()
+        body = json.dumps(self.data, indent=2, ensure_ascii=False).encode('utf-8')
+        with open(self.file_path, 'wb') as f:
+            f.write(body)
+        STORE_SAVE_SECONDS.labels("users").observe(time.perf_counter() - started)
+        STORE_SAVE_BYTES.labels("users").observe(len(body))
 
     def get_all_users(self):
         return {'users': list(self.data["users"].keys())}
@@ -0,0 +1,167 @@
+import cProfile
+import io
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+class ProfileStore:
+    """Кольцо файлов профилей на диске: хранятся только последние max_files"""
+    def __init__(self, directory: str = "profiles", max_files: int = 50):
+        self.directory = directory
+        self.max_files = max_files
+        os.makedirs(directory, exist_ok=True)
+
+    def save(self, name: str, content: str):
+        with open(os.path.join(self.directory, name), 'w', encoding='utf-8') as f:
+            f.write(content)
+        # Имена начинаются с времени в мс, поэтому сортировка по имени - хронологическая
+        names = sorted(os.listdir(self.directory))
+        for old in names[:max(len(names) - self.max_files, 0)]:
+            os.remove(os.path.join(self.directory, old))
+
+    def list(self) -> List[Dict]:
+        result = []
+        for name in sorted(os.listdir(self.directory), reverse=True):
+            stat = os.stat(os.path.join(self.directory, name))
+            result.append({"name": name, "size": stat.st_size, "created": stat.st_mtime})
+        return result
+
+    def read(self, name: str) -> Optional[str]:
+        if name != os.path.basename(name) or name not in os.listdir(self.directory):
+            return None
+        with open(os.path.join(self.directory, name), 'r', encoding='utf-8') as f:
+            return f.read()
+
+class StackSampler:
+    """Фоновый поток, снимающий стек потока event loop, пока есть запросы в обработке.
+
+    Выборки общие для всех одновременных запросов: профиль медленного запроса
+    показывает все, что loop делал за время его выполнения.
+    """
+    def __init__(self, interval: float = 0.005, max_samples: int = 20000):
+        self.interval = interval
+        self._samples = deque(maxlen=max_samples)  # (monotonic time, свернутый стек)
+        self._lock = threading.Lock()
+        self._active = 0
+        self._thread_id: Optional[int] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def begin(self):
+        if self._thread is None:
+            self._thread_id = threading.get_ident()
+            self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+            self._thread.start()
+        self._active += 1
+
+    def end(self):
+        self._active -= 1
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            if not self._active:
+                continue
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is None:
+                continue
+            stack = self._collapse(frame)
+            with self._lock:
+                self._samples.append((time.monotonic(), stack))
+
+    @staticmethod
+    def _collapse(frame) -> str:
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+    def collect(self, start: float, end: float) -> str:
+        """Свернутые стеки (формат flamegraph.pl) за интервал [start, end] по time.monotonic()"""
+        with self._lock:
+            samples = list(self._samples)
+        counts: Dict[str, int] = {}
+        for moment, stack in samples:
+            if start <= moment <= end:
+                counts[stack] = counts.get(stack, 0) + 1
+        return "".join(
+            f"{stack} {count}\n"
+            for stack, count in sorted(counts.items(), key=lambda entry: -entry[1])
+        )
+
+class ProfilingMiddleware:
+    """ASGI middleware: cProfile по заголовку X-Profile от менеджера и
+    выборочный профиль запросов дольше slow_threshold секунд"""
+    def __init__(
+        self,
+        app,
+        store: ProfileStore,
+        authorize: Callable[[Optional[str]], bool],
+        slow_threshold: Optional[float] = None
+    ):
+        self.app = app
+        self.store = store
+        self.authorize = authorize
+        self.slow_threshold = slow_threshold
+        self.sampler = StackSampler() if slow_threshold is not None else None
+        self._profiling = False  # cProfile нельзя запускать вложенно
+
+    @staticmethod
+    def _profile_name(scope, elapsed: float, kind: str) -> str:
+        path = re.sub(r"[^A-Za-z0-9_.-]+", "_", scope["path"]).strip("_") or "root"
+        return f"{int(time.time() * 1000):015d}-{scope['method']}-{path[:80]}-{int(elapsed * 1000)}ms.{kind}.txt"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        requested = b"x-profile" in headers and not self._profiling
+        if requested:
+            authorization = headers.get(b"authorization")
+            requested = self.authorize(authorization.decode("latin-1") if authorization else None)
+
+        if requested:
+            await self._run_profiled(scope, receive, send)
+            return
+
+        if self.sampler is None:
+            await self.app(scope, receive, send)
+            return
+
+        self.sampler.begin()
+        started = time.monotonic()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.sampler.end()
+            elapsed = time.monotonic() - started
+            if elapsed >= self.slow_threshold:
+                self.store.save(
+                    self._profile_name(scope, elapsed, "slow"),
+                    self.sampler.collect(started, started + elapsed)
+                )
+
+    async def _run_profiled(self, scope, receive, send):
+        self._profiling = True
+        profiler = cProfile.Profile()
+        started = time.monotonic()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            profiler.disable()
+            self._profiling = False
+            report = io.StringIO()
+            pstats.Stats(profiler, stream=report).sort_stats("cumulative").print_stats(60)
+            self.store.save(
+                self._profile_name(scope, time.monotonic() - started, "cprofile"),
+                report.getvalue()
+            )
@@ -0,0 +1,52 @@
+import json
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Any, Callable, Hashable, Tuple
+
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _default(value: Any):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(data: Any) -> bytes:
+    """JSON в байтах: orjson, если установлен, иначе стандартный json"""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'), default=_default).encode('utf-8')
+
+class JSONBytesResponse(Response):
+    """Ответ из уже сериализованного JSON, без response_model валидации"""
+    media_type = "application/json"
+
+class ResponseCache:
+    """Сериализованные ответы, действительные пока не изменилась версия хранилища"""
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[int, bytes]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, version: int, build: Callable[[], Any]) -> bytes:
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == version:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry[1]
+
+        self.misses += 1
+        body = dumps(build())
+        self._entries[key] = (version, body)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return body
+
+    def response(self, key: Hashable, version: int, build: Callable[[], Any]) -> JSONBytesResponse:
+        return JSONBytesResponse(content=self.get(key, version, build))
@@ -0,0 +1,70 @@
+import re
+import sys
+from bisect import bisect_left, insort
+from typing import Dict, Hashable, List, Optional, Set, Tuple
+
+# \w в Python 3 понимает Unicode, так что кириллица разбивается на слова так же, как латиница
+_TOKEN = re.compile(r"\w+")
+
+def tokenize(text: Optional[str]) -> List[str]:
+    if not text:
+        return []
+    return _TOKEN.findall(text.casefold().replace("ё", "е"))
+
+class SearchIndex:
+    """Инвертированный индекс слов с поиском по префиксу.
+
+    Документ - произвольный ключ (например, (storage_id, name) или task_id) и набор текстов.
+    Слова интернируются, а слова документа хранятся кортежем: индекс держит по одной
+    копии каждого слова, а не по копии на документ.
+    """
+    def __init__(self):
+        self._postings: Dict[str, Set[Hashable]] = {}  # слово -> ключи документов
+        self._documents: Dict[Hashable, Tuple[str, ...]] = {}  # ключ -> слова документа
+        self._vocabulary: List[str] = []  # отсортированные слова для поиска по префиксу
+
+    def add(self, key: Hashable, *texts: Optional[str]):
+        self.remove(key)
+        tokens = tuple(dict.fromkeys(sys.intern(token) for text in texts for token in tokenize(text)))
+        self._documents[key] = tokens
+        for token in tokens:
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = set()
+                insort(self._vocabulary, token)
+            postings.add(key)
+
+    def remove(self, key: Hashable):
+        for token in self._documents.pop(key, ()):
+            postings = self._postings[token]
+            postings.discard(key)
+            if not postings:
+                del self._postings[token]
+                del self._vocabulary[bisect_left(self._vocabulary, token)]
+
+    def _prefix_matches(self, prefix: str) -> Set[Hashable]:
+        matches = set()
+        for i in range(bisect_left(self._vocabulary, prefix), len(self._vocabulary)):
+            token = self._vocabulary[i]
+            if not token.startswith(prefix):
+                break
+            matches |= self._postings[token]
+        return matches
+
+    def search(self, query: str, limit: int = 20) -> List[Hashable]:
+        """Документы, содержащие все слова запроса (каждое как префикс), точные совпадения выше"""
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return []
+
+        candidates = sorted((self._prefix_matches(token) for token in tokens), key=len)
+        found = set(candidates[0])
+        for matches in candidates[1:]:
+            found &= matches
+            if not found:
+                return []
+
+        def exact_matches(key: Hashable) -> int:
+            return sum(1 for token in tokens if key in self._postings.get(token, ()))
+
+        return sorted(found, key=lambda key: (-exact_matches(key), key))[:limit]
@@ -1,24 +1,29 @@
 from pydantic import BaseModel, Field
-from typing import Dict, List, Optional
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
 import json
 import os
+import sys
+import time
+from bisect import bisect_left, bisect_right, insort
+from contextlib import contextmanager
 from uuid import uuid4
 from datetime import datetime, timezone, timedelta
 
 import chardet
 
+from SearchIndex import SearchIndex
+from Metrics import STORE_LOAD_SECONDS, STORE_SAVE_BYTES, STORE_SAVE_SECONDS
+
+def default_expiration() -> str:
+    return (datetime.now(timezone.utc) + timedelta(days=30)).strftime('%Y-%m-%dT%H:%M:%SZ')
+
 class Item(BaseModel):
     id: str
     name: str
     count: int
     storage_id: str
     category: Optional[str] = None
-    expiration_date: str = Field(
-        default_factory=lambda: (
-            (datetime.now(timezone.utc) + timedelta(days=30))
-            .strftime('%Y-%m-%dT%H:%M:%SZ')
-        )
-    )
+    expiration_date: str = Field(default_factory=default_expiration)
 
 class ItemCreate(BaseModel):
     name: str
@@ -39,41 +44,362 @@ class Storage(BaseModel):
     capacity: int
     current_load: int
 
+class CategorySummary(BaseModel):
+    category: Optional[str] = None
+    total_count: int
+    item_count: int
+
+class StorageSummary(BaseModel):
+    id: str
+    name: str
+    capacity: int
+    current_load: int
+    free_capacity: int
+    item_count: int
+    fill_ratio: float
+    categories: List[CategorySummary]
+
+class PlacementSuggestion(BaseModel):
+    storage_id: str
+    name: str
+    location: str
+    free_capacity: int
+    has_product: bool
+    has_category: bool
+
+class InventorySummary(BaseModel):
+    capacity: int
+    current_load: int
+    free_capacity: int
+    item_count: int
+    fill_ratio: float
+    storages: List[StorageSummary]
+    categories: List[CategorySummary]
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if value is not None else None
+
+class ItemRecord:
+    """Компактная запись товара внутри StorageDB.
+
+    Повторяющиеся строки (название, категория, склад, дата) интернированы, Pydantic-модель
+    Item строится только при выдаче наружу.
+    """
+    __slots__ = ("id", "name", "count", "storage_id", "category", "expiration_date")
+
+    def __init__(
+        self,
+        id: str,
+        name: str,
+        count: int,
+        storage_id: str,
+        category: Optional[str] = None,
+        expiration_date: Optional[str] = None
+    ):
+        self.id = id
+        self.name = sys.intern(name)
+        self.count = int(count)
+        self.storage_id = sys.intern(storage_id)
+        self.category = _intern(category)
+        self.expiration_date = sys.intern(expiration_date or default_expiration())
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ItemRecord":
+        return cls(
+            id=str(data["id"]),
+            name=str(data["name"]),
+            count=data["count"],
+            storage_id=str(data["storage_id"]),
+            category=data.get("category"),
+            expiration_date=data.get("expiration_date")
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "count": self.count,
+            "storage_id": self.storage_id,
+            "category": self.category,
+            "expiration_date": self.expiration_date
+        }
+
+    def to_model(self) -> Item:
+        # Данные уже проверены при записи, повторная валидация не нужна
+        return Item.construct(**self.to_dict())
+
+    def copy(self) -> "ItemRecord":
+        return ItemRecord(
+            self.id, self.name, self.count, self.storage_id, self.category, self.expiration_date
+        )
+
+def parse_expiration(value: Optional[str]) -> float:
+    """ISO-дата срока годности -> UTC timestamp (нераспознанные даты -> inf)"""
+    if not value:
+        return float("inf")
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return float("inf")
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+# Больше любого ключа (storage_id, name) - для bisect по одному timestamp
+_MAX_KEY = (chr(0x10FFFF),)
+
+class ExpirationIndex:
+    """Отсортированные по сроку годности ключи (storage_id, name) товаров.
+
+    Записи (timestamp, key) ссылаются на тот же кортеж key, что и остальные индексы склада.
+    """
+    def __init__(self):
+        self._all: List[Tuple[float, Tuple[str, str]]] = []
+        self._by_storage: Dict[str, List[Tuple[float, Tuple[str, str]]]] = {}
+        self._entries: Dict[Tuple[str, str], Tuple[float, Tuple[str, str]]] = {}
+
+    def add(self, key: Tuple[str, str], item: ItemRecord):
+        self.remove(*key)
+        entry = (parse_expiration(item.expiration_date), key)
+        insort(self._all, entry)
+        insort(self._by_storage.setdefault(key[0], []), entry)
+        self._entries[key] = entry
+
+    def remove(self, storage_id: str, item_name: str):
+        entry = self._entries.pop((storage_id, item_name), None)
+        if entry is None:
+            return
+        for entries in (self._all, self._by_storage[storage_id]):
+            del entries[bisect_left(entries, entry)]
+
+    def until(
+        self, deadline: float, storage_id: Optional[str] = None, after: float = float("-inf")
+    ) -> List[Tuple[str, str]]:
+        """Ключи товаров со сроком годности в (after, deadline], ближайшие первыми"""
+        if storage_id is None:
+            entries = self._all
+        else:
+            entries = self._by_storage.get(storage_id, [])
+        start = bisect_right(entries, (after, _MAX_KEY))
+        end = bisect_right(entries, (deadline, _MAX_KEY))
+        return [key for _, key in entries[start:end]]
+
+    def get(self, storage_id: str, item_name: str) -> Optional[float]:
+        entry = self._entries.get((storage_id, item_name))
+        return entry[0] if entry is not None else None
+
+    def next_after(self, moment: float) -> Optional[float]:
+        """Ближайший срок годности строго позже moment"""
+        i = bisect_right(self._all, (moment, _MAX_KEY))
+        if i < len(self._all) and self._all[i][0] != float("inf"):
+            return self._all[i][0]
+        return None
+
+class FreeSpaceIndex:
+    """Склады, отсортированные по свободному месту (capacity - current_load)"""
+    def __init__(self):
+        self._entries: List[Tuple[int, str]] = []
+        self.free: Dict[str, int] = {}
+
+    def update(self, storage_id: str, free: int):
+        old = self.free.get(storage_id)
+        if old == free:
+            return
+        if old is not None:
+            del self._entries[bisect_left(self._entries, (old, storage_id))]
+        insort(self._entries, (free, storage_id))
+        self.free[storage_id] = free
+
+    def fitting(self, count: int):
+        """(free, storage_id) складов, вмещающих count, от наименьшего подходящего"""
+        for i in range(bisect_left(self._entries, (count, "")), len(self._entries)):
+            yield self._entries[i]
+
 class StorageDB:
     def __init__(self, file_path: str = "storage_db.json"):
         self.file_path = file_path
         self.storages: Dict[str, Storage] = {}
-        self.items: Dict[str, List[Item]] = {}  # storage_id -> items
+        self.items: Dict[str, List[ItemRecord]] = {}  # storage_id -> items
+        self._lookup: Dict[str, Dict[str, ItemRecord]] = {}  # storage_id -> name -> item
+        self._expiration = ExpirationIndex()
+        # Счетчики [количество единиц, число позиций], обновляются при каждом изменении
+        self._line_counts: Dict[str, int] = {}  # storage_id -> число позиций
+        self._storage_categories: Dict[str, Dict[Optional[str], List[int]]] = {}
+        self._categories: Dict[Optional[str], List[int]] = {}
+        self._product_storages: Dict[str, Set[str]] = {}  # name -> storage_ids
+        self._category_storages: Dict[Optional[str], Set[str]] = {}  # category -> storage_ids
+        self._free_space = FreeSpaceIndex()
+        self._search = SearchIndex()  # (storage_id, name) по названию и категории
+        self._listeners: List[Callable[[], None]] = []
+        self._item_listeners: List[Callable[[str, str], None]] = []
+        self.version = 0  # растет при каждом сохраненном изменении
+        self._deferred = False
+        self._pending = False
+        self._flushed = False
         self._load()
 
     def _load(self):
+        started = time.perf_counter()
         if os.path.exists(self.file_path):
-            with open("storage_db.json", "rb") as f:
+            with open(self.file_path, "rb") as f:
                 raw_data = f.read()
+            try:
+                # _save пишет UTF-8: chardet (медленный и держащий свои модели в памяти)
+                # нужен только для файлов, сохраненных в другой кодировке
+                text = raw_data.decode("utf-8-sig")
+            except UnicodeDecodeError:
                 detected = chardet.detect(raw_data)
-                encoding = detected["encoding"]
-                with open(self.file_path, 'r', encoding=encoding) as f:
-                    data = json.load(f)
-                
-                    self.storages = {
-                        s["id"]: Storage(**s) 
-                        for s in data.get("storages", [])
-                    }
-                    self.items = {
-                        storage_id: [Item(**item) for item in items]
-                        for storage_id, items in data.get("items", {}).items()
-                    }
+                text = raw_data.decode(detected["encoding"])
+            data = json.loads(text)
+            del raw_data, text
+        
+            self.storages = {
+                s["id"]: Storage(**s) 
+                for s in data.get("storages", [])
+            }
+            self.items = {
+                storage_id: [ItemRecord.from_dict(item) for item in items]
+                for storage_id, items in data.get("items", {}).items()
+            }
+        self._reindex()
+        STORE_LOAD_SECONDS.labels("storage").set(time.perf_counter() - started)
+
+    def _reindex(self):
+        self._lookup = {}
+        self._expiration = ExpirationIndex()
+        self._line_counts = {}
+        self._storage_categories = {}
+        self._categories = {}
+        self._product_storages = {}
+        self._category_storages = {}
+        self._free_space = FreeSpaceIndex()
+        self._search = SearchIndex()
+        # current_load пересчитывается по товарам, чтобы убрать накопленное расхождение
+        for storage in self.storages.values():
+            storage.current_load = 0
+        for storage_id, items in self.items.items():
+            for item in items:
+                self._index_item(storage_id, item)
+        for storage in self.storages.values():
+            self._free_space.update(storage.id, storage.capacity - storage.current_load)
+
+    def _index_item(self, storage_id: str, item: ItemRecord):
+        self._lookup.setdefault(storage_id, {})[item.name] = item
+        self._product_storages.setdefault(item.name, set()).add(storage_id)
+        # Один кортеж-ключ на позицию для всех индексов
+        key = (storage_id, item.name)
+        self._expiration.add(key, item)
+        self._search.add(key, item.name, item.category)
+        self._account(storage_id, item.category, item.count, 1)
+        for listener in self._item_listeners:
+            listener(storage_id, item.name)
+
+    def _unindex_item(self, storage_id: str, item_name: str):
+        item = self._lookup.get(storage_id, {}).pop(item_name, None)
+        if item is None:
+            return
+        holders = self._product_storages[item_name]
+        holders.discard(storage_id)
+        if not holders:
+            del self._product_storages[item_name]
+        self._expiration.remove(storage_id, item_name)
+        self._search.remove((storage_id, item_name))
+        self._account(storage_id, item.category, -item.count, -1)
+
+    def _set_count(self, storage_id: str, item: ItemRecord, count: int):
+        self._account(storage_id, item.category, count - item.count, 0)
+        item.count = count
+
+    def _account(self, storage_id: str, category: Optional[str], units: int, lines: int):
+        if storage_id in self.storages and units:
+            storage = self.storages[storage_id]
+            storage.current_load += units
+            self._free_space.update(storage_id, storage.capacity - storage.current_load)
+        self._line_counts[storage_id] = self._line_counts.get(storage_id, 0) + lines
+        storage_categories = self._storage_categories.setdefault(storage_id, {})
+        if category not in storage_categories:
+            self._category_storages.setdefault(category, set()).add(storage_id)
+        for totals in (storage_categories, self._categories):
+            counters = totals.setdefault(category, [0, 0])
+            counters[0] += units
+            counters[1] += lines
+            if counters[1] == 0:
+                del totals[category]
+        if category not in storage_categories:
+            holders = self._category_storages[category]
+            holders.discard(storage_id)
+            if not holders:
+                del self._category_storages[category]
 
     def _save(self):
-        with open(self.file_path, 'w') as f:
-            data = {
-                "storages": [s.dict() for s in self.storages.values()],
-                "items": {
-                    storage_id: [i.dict() for i in items]
-                    for storage_id, items in self.items.items()
-                }
+        started = time.perf_counter()
+        data = {
+            "storages": [s.dict() for s in self.storages.values()],
+            "items": {
+                storage_id: [i.to_dict() for i in items]
+                for storage_id, items in self.items.items()
             }
-            json.dump(data, f, indent=2)
+        }
+        body = json.dumps(data, indent=2).encode('utf-8')
+        with open(self.file_path, 'wb') as f:
+            f.write(body)
+        STORE_SAVE_SECONDS.labels("storage").observe(time.perf_counter() - started)
+        STORE_SAVE_BYTES.labels("storage").observe(len(body))
+
+    def subscribe(self, listener: Callable[[], None]):
+        """listener вызывается после каждого изменения склада"""
+        self._listeners.append(listener)
+
+    def subscribe_items(self, listener: Callable[[str, str], None]):
+        """listener(storage_id, name) вызывается, когда позиция добавлена или заменена (новый срок годности)"""
+        self._item_listeners.append(listener)
+
+    def _commit(self):
+        if self._deferred:
+            self._pending = True
+            return
+        self._save()
+        self._notify()
+
+    def _notify(self):
+        self.version += 1
+        for listener in self._listeners:
+            listener()
+
+    def flush(self):
+        """Сохраняет изменения, накопленные внутри transaction()"""
+        if self._pending:
+            self._save()
+            self._flushed = True
+
+    @contextmanager
+    def transaction(self, storage_ids: Iterable[str]):
+        """Откладывает сохранение до flush(); при исключении возвращает товары storage_ids в исходное состояние"""
+        snapshot = {
+            storage_id: [item.copy() for item in self.items.get(storage_id, [])]
+            for storage_id in set(storage_ids)
+        }
+        self._deferred, self._pending, self._flushed = True, False, False
+        try:
+            yield
+        except BaseException:
+            self._restore(snapshot)
+            if self._flushed:
+                self._save()
+            raise
+        finally:
+            pending = self._pending
+            self._deferred, self._pending, self._flushed = False, False, False
+        if pending:
+            self._notify()
+
+    def _restore(self, snapshot: Dict[str, List[ItemRecord]]):
+        for storage_id, items in snapshot.items():
+            for item in self.items.get(storage_id, []):
+                self._unindex_item(storage_id, item.name)
+            self.items[storage_id] = items
+            for item in items:
+                self._index_item(storage_id, item)
 
     def init_storages(self):
         """Инициализация 24 хранилищ"""
@@ -87,7 +413,9 @@ class StorageDB:
                     capacity=1000,
                     current_load=0
                 )
+                self._free_space.update(storage_id, 1000)
             self._save()
+            self._notify()
 
     def add_item(self, storage_id: str, item_data: ItemCreate) -> Item:
         # 1. Check if storage exists
@@ -100,11 +428,12 @@ class StorageDB:
             raise ValueError("Not enough capacity in storage")
         
         # 3. Create new item with unique ID
-        new_item = Item(
+        new_item = ItemRecord(
             id=str(uuid4()),  # Generate unique ID
             name=item_data.name,
             count=item_data.count,
             storage_id=storage_id,
+            category=item_data.category,
             # Add other fields from item_data as needed
         )
         
@@ -115,21 +444,146 @@ class StorageDB:
         # Check if item already exists (optional - merge counts if exists)
         for existing_item in self.items[storage_id]:
             if existing_item.name == new_item.name:
-                existing_item.count += new_item.count
-                self._save()
-                return existing_item
+                self._set_count(storage_id, existing_item, existing_item.count + new_item.count)
+                self._commit()
+                return existing_item.to_model()
         
         # If not exists, add new item
         self.items[storage_id].append(new_item)
-        storage.current_load += new_item.count
-        self._save()
+        self._index_item(storage_id, new_item)
+        self._commit()
         
-        return new_item
+        return new_item.to_model()
+
+    def find_item(self, item_name: str, storage_id: str) -> Optional[Item]:
+        item = self._lookup.get(storage_id, {}).get(item_name)
+        return item.to_model() if item is not None else None
+
+    def take_item(self, item_name: str, storage_id: str, count: int) -> Optional[Item]:
+        """Списывает count единиц товара; позиция удаляется, если товара не осталось"""
+        if count <= 0:
+            raise ValueError("Количество должно быть положительным")
+        item = self._lookup.get(storage_id, {}).get(item_name)
+        if item is None:
+            raise ValueError(f"Товар {item_name} не найден в хранилище {storage_id}")
+
+        remaining = item.count - count
+        if remaining <= 0:
+            self.items[storage_id].remove(item)
+            self._unindex_item(storage_id, item_name)
+            self._commit()
+            return None
+        self._set_count(storage_id, item, remaining)
+        self._commit()
+        return item.to_model()
 
     def get_items(self, storage_id: Optional[str] = None) -> List[Item]:
+        return [item.to_model() for item in self.iter_items(storage_id)]
+
+    def iter_items(self, storage_id: Optional[str] = None) -> Iterable[ItemRecord]:
+        """Внутренние записи без построения Pydantic-моделей"""
         if storage_id:
             return self.items.get(storage_id, [])
-        return [item for items in self.items.values() for item in items]
+        return (item for items in self.items.values() for item in items)
+
+    def search_items(self, query: str, limit: int = 20) -> List[Item]:
+        return [
+            self._lookup[storage_id][name].to_model()
+            for storage_id, name in self._search.search(query, limit)
+        ]
+
+    def suggest_storages(self, item_data: ItemCreate, limit: int = 5) -> List[PlacementSuggestion]:
+        """Склады для приемки: сначала где уже есть этот товар, затем с той же категорией,
+        затем остальные; внутри группы - наименьшее достаточное свободное место"""
+        free = self._free_space.free
+        product_holders = self._product_storages.get(item_data.name, set())
+        category_holders = self._category_storages.get(item_data.category, set()) if item_data.category else set()
+
+        ranked = sorted(
+            (free[s_id], s_id) for s_id in product_holders
+            if s_id in free and free[s_id] >= item_data.count
+        )
+        ranked += sorted(
+            (free[s_id], s_id) for s_id in category_holders - product_holders
+            if s_id in free and free[s_id] >= item_data.count
+        )
+        if len(ranked) < limit:
+            for free_capacity, s_id in self._free_space.fitting(item_data.count):
+                if s_id in product_holders or s_id in category_holders:
+                    continue
+                ranked.append((free_capacity, s_id))
+                if len(ranked) >= limit:
+                    break
+
+        suggestions = []
+        for free_capacity, s_id in ranked[:limit]:
+            storage = self.storages[s_id]
+            suggestions.append(PlacementSuggestion(
+                storage_id=s_id,
+                name=storage.name,
+                location=storage.location,
+                free_capacity=free_capacity,
+                has_product=s_id in product_holders,
+                has_category=s_id in category_holders
+            ))
+        return suggestions
+
+    def get_summary(self) -> InventorySummary:
+        """Сводка по складам и категориям из поддерживаемых счетчиков (без обхода товаров)"""
+        def categories(totals: Dict[Optional[str], List[int]]) -> List[CategorySummary]:
+            return [
+                CategorySummary(category=category, total_count=units, item_count=lines)
+                for category, (units, lines) in totals.items()
+            ]
+
+        storages = [
+            StorageSummary(
+                id=storage.id,
+                name=storage.name,
+                capacity=storage.capacity,
+                current_load=storage.current_load,
+                free_capacity=storage.capacity - storage.current_load,
+                item_count=self._line_counts.get(storage.id, 0),
+                fill_ratio=storage.current_load / storage.capacity if storage.capacity else 0.0,
+                categories=categories(self._storage_categories.get(storage.id, {}))
+            )
+            for storage in self.storages.values()
+        ]
+        capacity = sum(s.capacity for s in storages)
+        current_load = sum(s.current_load for s in storages)
+        return InventorySummary(
+            capacity=capacity,
+            current_load=current_load,
+            free_capacity=capacity - current_load,
+            item_count=sum(s.item_count for s in storages),
+            fill_ratio=current_load / capacity if capacity else 0.0,
+            storages=storages,
+            categories=categories(self._categories)
+        )
+
+    def get_expiring_items(self, within_days: float, storage_id: Optional[str] = None) -> List[Item]:
+        """Товары, срок годности которых истекает в ближайшие within_days дней (включая просроченные)"""
+        # Арифметика float вместо timedelta: большие within_days дают inf, а не OverflowError
+        deadline = time.time() + within_days * 24 * 60 * 60
+        return [
+            self._lookup[s_id][name].to_model()
+            for s_id, name in self._expiration.until(deadline, storage_id)
+        ]
+
+    def expiring_keys(self, after: float, deadline: float) -> List[Tuple[str, str]]:
+        """(storage_id, name) товаров со сроком годности в (after, deadline], ближайшие первыми"""
+        return self._expiration.until(deadline, after=after)
+
+    def get_record(self, storage_id: str, item_name: str) -> Optional[ItemRecord]:
+        return self._lookup.get(storage_id, {}).get(item_name)
+
+    def expiration_of(self, storage_id: str, item_name: str) -> Optional[float]:
+        """Срок годности позиции как UTC timestamp (None, если позиции нет)"""
+        return self._expiration.get(storage_id, item_name)
+
+    def next_expiration(self, after: float) -> Optional[float]:
+        """Timestamp ближайшего срока годности позже after (None, если таких нет)"""
+        return self._expiration.next_after(after)
 
     def update_item(self, item_name: str, storage_id : str, update_data: ItemUpdate) -> Optional[Item]:
 
@@ -141,19 +595,29 @@ class StorageDB:
                 # self._save()
                 # break
 
-                current_item = item.dict() if hasattr(item, 'dict') else dict(item)
+                current_item = item.to_dict()
                 
                 # Get the update data as a dictionary, excluding None values
-                update_dict = update_data.dict(exclude_unset=True)
+                # (явный null допустим только для category - остальные поля обязательны)
+                update_dict = {
+                    key: value
+                    for key, value in update_data.dict(exclude_unset=True).items()
+                    if value is not None or key == "category"
+                }
                 
                 # Update only the fields that are provided in update_data
                 updated_item = {**current_item, **update_dict}
+                # Позиции склада ключуются по названию: две записи с одним именем сломали бы индексы и счетчики
+                if updated_item["name"] != item_name and updated_item["name"] in self._lookup.get(storage_id, {}):
+                    raise ValueError(f"Товар {updated_item['name']} уже есть в хранилище {storage_id}")
                 
-                # Convert back to Item model if needed (replace Item with your actual item class)
-                self.items[storage_id][item_index] = Item(**updated_item)
+                # Проверяем итоговую позицию на границе записи: на диск попадают только валидные данные
+                self.items[storage_id][item_index] = ItemRecord.from_dict(Item(**updated_item).dict())
+                self._unindex_item(storage_id, item_name)
+                self._index_item(storage_id, self.items[storage_id][item_index])
                 
-                self._save()
-                return self.items[storage_id][item_index]
+                self._commit()
+                return self.items[storage_id][item_index].to_model()
                     
         
         return None
@@ -194,12 +658,11 @@ class StorageDB:
         remaining_count = item_to_move.count - count
         if remaining_count > 0:
             # Если остались предметы - обновляем количество
-            self.items[from_storage_id][item_index].count = remaining_count
+            self._set_count(from_storage_id, item_to_move, remaining_count)
         else:
             # Если предметов не осталось - удаляем
             self.items[from_storage_id].pop(item_index)
-        
-        self.storages[from_storage_id].current_load -= count
+            self._unindex_item(from_storage_id, item_name)
         
         # Создаем новую версию предмета для целевого хранилища
         new_item = item_to_move.copy()
@@ -219,15 +682,15 @@ class StorageDB:
         
         if existing_item_index is not None:
             # Если предмет уже есть - увеличиваем количество
-            self.items[to_storage_id][existing_item_index].count += count
+            existing_item = self.items[to_storage_id][existing_item_index]
+            self._set_count(to_storage_id, existing_item, existing_item.count + count)
         else:
             # Если предмета нет - добавляем новый
             self.items[to_storage_id].append(new_item)
+            self._index_item(to_storage_id, new_item)
         
-        self.storages[to_storage_id].current_load += count
-        
-        self._save()
-        return new_item
+        self._commit()
+        return new_item.to_model()
     
 
     def delete_item(self, item_name: str, storage_id:str) -> bool:
@@ -235,7 +698,8 @@ class StorageDB:
             item = self.items[storage_id][item_index]
             if item.name == item_name:
                 self.items[storage_id].pop(item_index)
-                self._save()
+                self._unindex_item(storage_id, item_name)
+                self._commit()
                 return True
         
         return False
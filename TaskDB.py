@@ -1,12 +1,17 @@
 from fastapi import FastAPI, HTTPException, Body
 from pydantic import BaseModel
-from typing import List, Optional, Dict
+from typing import Callable, List, Optional, Dict, Tuple
 from datetime import datetime
 import json
 import os
+import time
+from contextlib import contextmanager
 from enum import Enum
 from uuid import uuid4
 
+from SearchIndex import SearchIndex
+from Metrics import STORE_LOAD_SECONDS, STORE_SAVE_BYTES, STORE_SAVE_SECONDS
+
 class TaskStatus(str, Enum):
     TODO = "todo"
     IN_PROGRESS = "in_progress"
@@ -37,6 +42,18 @@ class TaskMove(BaseModel):
     new_status: TaskStatus
     new_assignee: Optional[str] = None
 
+def _item_key(task: Task) -> Optional[Tuple[str, str]]:
+    """(storage_id, product) товара, который открытая задача продает или вывозит"""
+    if task.status == TaskStatus.DONE or not task.query:
+        return None
+    try:
+        data = json.loads(task.query)
+    except ValueError:
+        return None
+    if not isinstance(data, dict) or data.get('action') not in ('sell', 'move'):
+        return None
+    return data.get('from') or data.get('storage'), data.get('product')
+
 class TaskDB:
     def __init__(self, file_path: str = "tasks_db.json"):
         self.file_path = file_path
@@ -45,9 +62,18 @@ class TaskDB:
             "in_progress": {},
             "done": {}
         }
+        self._locations: Dict[str, Tuple[str, str]] = {}  # task_id -> (status, user)
+        self._search = SearchIndex()  # task_id по заголовку и описанию
+        self._open_items: Dict[Tuple[str, str], int] = {}  # (storage_id, product) -> число открытых задач
+        self._listeners: List[Callable[[], None]] = []
+        self.version = 0  # растет при каждом сохраненном изменении
+        self._deferred = False
+        self._pending = False
+        self._flushed = False
         self._load()
 
     def _load(self):
+        started = time.perf_counter()
         if os.path.exists(self.file_path):
             with open(self.file_path, 'r') as f:
                 raw_data = json.load(f)
@@ -56,19 +82,141 @@ class TaskDB:
                         user: [Task(**task) for task in tasks]
                         for user, tasks in raw_data.get(status.value, {}).items()
                     }
+        self._locations = {}
+        self._search = SearchIndex()
+        self._open_items = {}
+        for status, user_tasks in self.data.items():
+            for user, tasks in user_tasks.items():
+                for task in tasks:
+                    self._locations[task.id] = (status, user)
+                    self._index_task(task)
+                    self._track(task)
+        STORE_LOAD_SECONDS.labels("tasks").set(time.perf_counter() - started)
+
+    def _index_task(self, task: Task):
+        self._search.add(task.id, task.title, task.description)
+
+    def _track(self, task: Task):
+        key = _item_key(task)
+        if key is not None:
+            self._open_items[key] = self._open_items.get(key, 0) + 1
+
+    def _untrack(self, task: Task):
+        key = _item_key(task)
+        if key is None:
+            return
+        self._open_items[key] -= 1
+        if not self._open_items[key]:
+            del self._open_items[key]
+
+    def has_open_task(self, storage_id: str, product: str) -> bool:
+        """Есть ли открытая задача, продающая или вывозящая товар со склада"""
+        return (storage_id, product) in self._open_items
 
     def _save(self):
-        with open(self.file_path, 'w') as f:
-            save_data = {
-                status: {
-                    user: [task.dict() for task in tasks]
-                    for user, tasks in user_tasks.items()
-                }
-                for status, user_tasks in self.data.items()
+        started = time.perf_counter()
+        save_data = {
+            status: {
+                user: [task.dict() for task in tasks]
+                for user, tasks in user_tasks.items()
             }
-            json.dump(save_data, f, indent=2, default=str)
+            for status, user_tasks in self.data.items()
+        }
+        body = json.dumps(save_data, indent=2, default=str).encode('utf-8')
+        with open(self.file_path, 'wb') as f:
+            f.write(body)
+        STORE_SAVE_SECONDS.labels("tasks").observe(time.perf_counter() - started)
+        STORE_SAVE_BYTES.labels("tasks").observe(len(body))
+
+    def subscribe(self, listener: Callable[[], None]):
+        """listener вызывается после каждого изменения задач"""
+        self._listeners.append(listener)
+
+    def _commit(self):
+        if self._deferred:
+            self._pending = True
+            return
+        self._save()
+        self._notify()
+
+    def _notify(self):
+        self.version += 1
+        for listener in self._listeners:
+            listener()
+
+    def flush(self):
+        """Сохраняет изменения, накопленные внутри transaction()"""
+        if self._pending:
+            self._save()
+            self._flushed = True
+
+    @contextmanager
+    def transaction(self, task_id: str):
+        """Откладывает сохранение до flush(); при исключении возвращает задачу task_id в исходное состояние"""
+        snapshot = self._snapshot(task_id)
+        self._deferred, self._pending, self._flushed = True, False, False
+        try:
+            yield
+        except BaseException:
+            self._restore(task_id, snapshot)
+            if self._flushed:
+                self._save()
+            raise
+        finally:
+            pending = self._pending
+            self._deferred, self._pending, self._flushed = False, False, False
+        if pending:
+            self._notify()
+
+    def _snapshot(self, task_id: str) -> Optional[Tuple[str, str, int, Task]]:
+        location = self._locate(task_id)
+        if location is None:
+            return None
+        status, user, i = location
+        return status, user, i, self.data[status][user][i]
+
+    def _restore(self, task_id: str, snapshot: Optional[Tuple[str, str, int, Task]]):
+        location = self._locate(task_id)
+        if location is not None:
+            status, user, i = location
+            self._untrack(self.data[status][user].pop(i))
+            del self._locations[task_id]
+            self._search.remove(task_id)
+        if snapshot is not None:
+            status, user, i, task = snapshot
+            self.data[status].setdefault(user, []).insert(i, task)
+            self._locations[task_id] = (status, user)
+            self._index_task(task)
+            self._track(task)
+
+    def _locate(self, task_id: str) -> Optional[Tuple[str, str, int]]:
+        location = self._locations.get(task_id)
+        if location is None:
+            return None
+        status, user = location
+        for i, task in enumerate(self.data[status][user]):
+            if task.id == task_id:
+                return status, user, i
+        return None
+
+    def get_task(self, task_id: str) -> Optional[Task]:
+        location = self._locate(task_id)
+        if location is None:
+            return None
+        status, user, i = location
+        return self.data[status][user][i]
 
     def create_task(self, task_data: TaskCreate) -> Task:
+        return self.create_tasks([task_data])[0]
+
+    def create_tasks(self, tasks_data: List[TaskCreate]) -> List[Task]:
+        """Создает несколько задач с одним сохранением"""
+        new_tasks = [self._append_task(task_data) for task_data in tasks_data]
+        if new_tasks:
+            self._commit()
+        return new_tasks
+
+    def _append_task(self, task_data: TaskCreate) -> Task:
         new_task = Task(
             id=str(uuid4()),
             title=task_data.title,
@@ -82,12 +230,17 @@ class TaskDB:
         if new_task.assigned_to not in self.data["todo"]:
             self.data["todo"][new_task.assigned_to] = []
         self.data["todo"][new_task.assigned_to].append(new_task)
-        self._save()
+        self._locations[new_task.id] = ("todo", new_task.assigned_to)
+        self._index_task(new_task)
+        self._track(new_task)
         return new_task
 
     def get_all_tasks(self) -> Dict[str, Dict[str, List[Task]]]:
         return self.data
 
+    def search_tasks(self, query: str, limit: int = 20) -> List[Task]:
+        return [self.get_task(task_id) for task_id in self._search.search(query, limit)]
+
     def get_user_tasks(self, user: str) -> Dict[str, List[Task]]:
         return {
             status: tasks.get(user, [])
@@ -95,24 +248,22 @@ class TaskDB:
         }
 
     def update_task(self, task_id: str, update_data: TaskUpdate) -> Optional[Task]:
-        for status in TaskStatus:
-            for user, tasks in self.data[status.value].items():
-                for i, task in enumerate(tasks):
-                    if task.id == task_id:
-                        if update_data.status and update_data.status != status:
-                            return self._move_task(task, status, update_data)
-                        
-                        updated_task = task.copy(update=update_data.dict(exclude_unset=True))
-                        self.data[status.value][user][i] = updated_task
-                        self._save()
-                        return updated_task
-        return None
+        location = self._locate(task_id)
+        if location is None:
+            return None
+        status, user, i = location
+        task = self.data[status][user][i]
+        if update_data.status and update_data.status != status:
+            return self._move_task(task, status, user, i, update_data)
 
-    def _move_task(self, task: Task, old_status: TaskStatus, update_data: TaskUpdate) -> Task:
-        self.data[old_status.value][task.assigned_to] = [
-            t for t in self.data[old_status.value][task.assigned_to] 
-            if t.id != task.id
-        ]
+        updated_task = task.copy(update=update_data.dict(exclude_unset=True))
+        self.data[status][user][i] = updated_task
+        self._index_task(updated_task)
+        self._commit()
+        return updated_task
+
+    def _move_task(self, task: Task, old_status: str, user: str, index: int, update_data: TaskUpdate) -> Task:
+        self.data[old_status][user].pop(index)
         
         updated_task = task.copy(update=update_data.dict(exclude_unset=True))
         updated_task.status = update_data.status
@@ -121,15 +272,21 @@ class TaskDB:
         if new_assignee not in self.data[updated_task.status.value]:
             self.data[updated_task.status.value][new_assignee] = []
         self.data[updated_task.status.value][new_assignee].append(updated_task)
-        self._save()
+        self._locations[task.id] = (updated_task.status.value, new_assignee)
+        self._index_task(updated_task)
+        self._untrack(task)
+        self._track(updated_task)
+        self._commit()
         return updated_task
 
     def delete_task(self, task_id: str) -> bool:
-        for status in TaskStatus:
-            for user, tasks in self.data[status.value].items():
-                for i, task in enumerate(tasks):
-                    if task.id == task_id:
-                        self.data[status.value][user].pop(i)
-                        self._save()
-                        return True
-        return False
\ No newline at end of file
+        location = self._locate(task_id)
+        if location is None:
+            return False
+        status, user, i = location
+        task = self.data[status][user].pop(i)
+        del self._locations[task_id]
+        self._search.remove(task_id)
+        self._untrack(task)
+        self._commit()
+        return True
\ No newline at end of file
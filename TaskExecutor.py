@@ -0,0 +1,101 @@
+import json
+from enum import Enum
+from typing import Dict, Optional
+
+from pydantic import BaseModel, Field
+
+from StorageDB import StorageDB, ItemCreate
+from TaskDB import TaskDB, Task, TaskCreate, TaskUpdate, TaskStatus
+
+class TaskAction(str, Enum):
+    SELL = "sell"
+    ADD = "add"
+    MOVE = "move"
+
+class TaskQuery(BaseModel):
+    action: TaskAction
+    product: str
+    count: int
+    storage: str
+    from_storage: Optional[str] = Field(None, alias="from")
+
+class TaskExecutor:
+    """Создание задач с проверкой query и выполнение их складских действий.
+
+    Переход задачи в done и изменение склада применяются вместе: одно сохранение
+    каждого хранилища в конце, откат обоих при любой ошибке.
+    """
+    def __init__(self, task_db: TaskDB, storage_db: StorageDB):
+        self.task_db = task_db
+        self.storage_db = storage_db
+        self._queries: Dict[str, Optional[TaskQuery]] = {}  # task_id -> разобранный query
+
+    def parse_query(self, query: Optional[str]) -> Optional[TaskQuery]:
+        if query is None:
+            return None
+        try:
+            data = json.loads(query)
+        except ValueError as e:
+            raise ValueError(f"Invalid task query: {str(e)}")
+        if not isinstance(data, dict):
+            raise ValueError("Invalid task query: ожидается JSON-объект")
+        try:
+            parsed = TaskQuery(**data)
+        except ValueError as e:
+            raise ValueError(f"Invalid task query: {str(e)}")
+
+        if parsed.count <= 0:
+            raise ValueError("Количество должно быть положительным")
+        if parsed.storage not in self.storage_db.storages:
+            raise ValueError(f"Storage {parsed.storage} not found")
+        if parsed.action == TaskAction.MOVE:
+            if parsed.from_storage is None:
+                raise ValueError("Для перемещения нужно указать исходное хранилище (from)")
+            if parsed.from_storage not in self.storage_db.storages:
+                raise ValueError(f"Storage {parsed.from_storage} not found")
+        return parsed
+
+    def create_task(self, task_data: TaskCreate) -> Task:
+        query = self.parse_query(task_data.query)
+        task = self.task_db.create_task(task_data)
+        self._queries[task.id] = query
+        return task
+
+    def forget(self, task_id: str):
+        self._queries.pop(task_id, None)
+
+    def _get_query(self, task: Task) -> Optional[TaskQuery]:
+        # Задачи, загруженные из файла или созданные в обход executor, разбираются при первом обращении
+        if task.id not in self._queries:
+            self._queries[task.id] = self.parse_query(task.query)
+        return self._queries[task.id]
+
+    def update_task(self, task_id: str, update_data: TaskUpdate) -> Optional[Task]:
+        task = self.task_db.get_task(task_id)
+        if task is None:
+            return None
+
+        completing = update_data.status == TaskStatus.DONE and task.status != TaskStatus.DONE
+        query = self._get_query(task) if completing else None
+        storage_ids = []
+        if query is not None:
+            storage_ids = [query.storage] + ([query.from_storage] if query.from_storage else [])
+
+        with self.storage_db.transaction(storage_ids), self.task_db.transaction(task_id):
+            updated_task = self.task_db.update_task(task_id, update_data)
+            if query is not None:
+                self._apply(query)
+            self.storage_db.flush()
+            self.task_db.flush()
+
+        if completing:
+            self.forget(task_id)
+        return updated_task
+
+    def _apply(self, query: TaskQuery):
+        if query.action == TaskAction.SELL:
+            self.storage_db.take_item(query.product, query.storage, query.count)
+        elif query.action == TaskAction.ADD:
+            self.storage_db.add_item(query.storage, ItemCreate(name=query.product, count=query.count))
+        elif query.action == TaskAction.MOVE:
+            self.storage_db._move_item(query.product, query.from_storage, query.storage, query.count)
@@ -0,0 +1,156 @@
+"""Синтетические database.json, tasks_db.json и storage_db.json заданного масштаба.
+
+    python benchmarks/dataset.py --out /tmp/bench --users 50 --tasks-per-status 20 --items-per-storage 200
+"""
+import argparse
+import json
+import os
+import random
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from passlib.context import CryptContext
+
+PASSWORD = "password"
+
+PRODUCTS = [
+    ("Картофель", "Овощи"), ("Морковь", "Овощи"), ("Салат Романо", "Овощи"), ("Томаты", "Овощи"),
+    ("Апельсины", "Фрукты"), ("Клубника", "Фрукты"), ("Нектарины", "Фрукты"), ("Дыня Канталупа", "Фрукты"),
+    ("Молоко", "Молочные продукты"), ("Сыр", "Молочные продукты"), ("Хлеб", "Хлеб"), ("Курица", "Мясо"),
+    ("Potatoes", "Овощи"), ("Strawberries", "Фрукты"), ("Iceberg Lettuce", "Овощи"), ("Oranges", "Фрукты"),
+]
+ZONES = ["A", "B", "C", "D"]
+
+def product_names(count: int):
+    """count разных названий: базовые продукты, дальше с номером партии"""
+    for i in range(count):
+        name, category = PRODUCTS[i % len(PRODUCTS)]
+        batch = i // len(PRODUCTS)
+        yield (name if batch == 0 else f"{name} {batch + 1}"), category
+
+def make_users(users: int, managers: int, bcrypt_rounds: int):
+    # Один хеш на всех: bcrypt дорогой, а пароль у синтетических пользователей общий
+    hashed = CryptContext(schemes=["bcrypt"], bcrypt__rounds=bcrypt_rounds).hash(PASSWORD)
+    result = {}
+    for i in range(users):
+        username = f"user_{i}"
+        result[username] = {
+            "username": username,
+            "email": f"{username}@example.com",
+            "full_name": f"Пользователь {i}",
+            "hashed_password": hashed,
+            "disabled": False,
+            "is_manager": i < managers
+        }
+    return {"users": result}
+
+def make_storage(storages: int, items_per_storage: int, rnd: random.Random):
+    now = datetime.now(timezone.utc)
+    storage_list = []
+    items = {}
+    for s in range(1, storages + 1):
+        storage_id = f"storage_{s}"
+        storage_items = []
+        for name, category in product_names(items_per_storage):
+            expiration = now + timedelta(days=rnd.uniform(-10, 60))
+            storage_items.append({
+                "id": str(uuid4()),
+                "name": name,
+                "count": rnd.randint(1, 100),
+                "storage_id": storage_id,
+                "category": category,
+                "expiration_date": expiration.strftime('%Y-%m-%dT%H:%M:%SZ')
+            })
+        load = sum(item["count"] for item in storage_items)
+        storage_list.append({
+            "id": storage_id,
+            "name": f"Склад {s}",
+            "location": f"Зона {ZONES[s % len(ZONES)]}",
+            "capacity": load * 2 + 1000,
+            "current_load": load
+        })
+        items[storage_id] = storage_items
+    return {"storages": storage_list, "items": items}
+
+def make_tasks(usernames, tasks_per_status: int, storage: dict, rnd: random.Random):
+    storage_ids = [s["id"] for s in storage["storages"]]
+    now = datetime.now()
+    data = {}
+    for status in ("todo", "in_progress", "done"):
+        data[status] = {}
+        for username in usernames:
+            tasks = []
+            for _ in range(tasks_per_status):
+                storage_id = rnd.choice(storage_ids)
+                item = rnd.choice(storage["items"][storage_id])
+                action = rnd.choice(["sell", "move", "add", None])
+                query = None
+                if action is not None:
+                    query = {"action": action, "product": item["name"], "count": 1, "storage": storage_id}
+                    if action == "move":
+                        query["from"] = storage_id
+                        query["storage"] = rnd.choice([s for s in storage_ids if s != storage_id] or storage_ids)
+                    query = json.dumps(query, ensure_ascii=False, separators=(',', ':'))
+                tasks.append({
+                    "id": str(uuid4()),
+                    "title": f"Необходимо {action or 'проверить'} {item['name']} ({storage_id})",
+                    "description": f"Синтетическая задача для {username}",
+                    "assigned_to": username,
+                    "created_at": str(now - timedelta(minutes=rnd.randint(0, 60 * 24 * 30))),
+                    "status": status,
+                    "query": query
+                })
+            data[status][username] = tasks
+    return data
+
+def generate(
+    out: str,
+    users: int = 50,
+    managers: int = 5,
+    tasks_per_status: int = 20,
+    storages: int = 24,
+    items_per_storage: int = 200,
+    bcrypt_rounds: int = 12,
+    seed: int = 1
+):
+    rnd = random.Random(seed)
+    os.makedirs(out, exist_ok=True)
+    database = make_users(users, managers, bcrypt_rounds)
+    storage = make_storage(storages, items_per_storage, rnd)
+    tasks = make_tasks(list(database["users"]), tasks_per_status, storage, rnd)
+    for name, data in (("database.json", database), ("storage_db.json", storage), ("tasks_db.json", tasks)):
+        with open(os.path.join(out, name), 'w', encoding='utf-8') as f:
+            # Как пишут сами хранилища: FileDatabase без экранирования, остальные с ним
+            json.dump(data, f, indent=2, ensure_ascii=name != "database.json")
+    return database, storage, tasks
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--managers", type=int, default=5)
+    parser.add_argument("--tasks-per-status", type=int, default=20)
+    parser.add_argument("--storages", type=int, default=24)
+    parser.add_argument("--items-per-storage", type=int, default=200)
+    parser.add_argument("--bcrypt-rounds", type=int, default=12)
+    parser.add_argument("--seed", type=int, default=1)
+
+def generate_from_args(out: str, args):
+    return generate(
+        out,
+        users=args.users,
+        managers=args.managers,
+        tasks_per_status=args.tasks_per_status,
+        storages=args.storages,
+        items_per_storage=args.items_per_storage,
+        bcrypt_rounds=args.bcrypt_rounds,
+        seed=args.seed
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", default=".")
+    add_arguments(parser)
+    args = parser.parse_args()
+    generate_from_args(args.out, args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Память и время загрузки склада: StorageDB целиком (записи и все индексы),
+отдельно - только записи, Pydantic Item против ItemRecord.
+
+    python benchmarks/item_store.py --storages 24 --items-per-storage 4000
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dataset import make_storage
+from StorageDB import Item, ItemRecord, StorageDB
+
+def traced(build):
+    """Память, оставшаяся занятой после build(), и сам результат"""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return retained, result
+
+def report(label: str, retained: int, count: int, load_time: float, dump_time: float):
+    print(f"{label:<12} {retained / count:>10.1f} {retained / 2**20:>10.1f} {load_time:>9.2f} {dump_time:>9.2f}")
+
+def measure_store(path: str, count: int):
+    """Загрузка storage_db.json целиком: записи, _lookup, срок годности, поиск, счетчики"""
+    gc.collect()
+    started = time.perf_counter()
+    db = StorageDB(path)
+    load_time = time.perf_counter() - started
+    started = time.perf_counter()
+    db._save()
+    dump_time = time.perf_counter() - started
+    del db
+
+    # Отдельный проход под tracemalloc: он сильно замедляет выделение памяти
+    retained, db = traced(lambda: StorageDB(path))
+    del db
+    report("StorageDB", retained, count, load_time, dump_time)
+
+def measure_records(label: str, build, serialize, chunks, count: int):
+    def load():
+        items = []
+        for chunk in chunks:
+            items.extend(build(data) for data in json.loads(chunk))
+        return items
+
+    gc.collect()
+    started = time.perf_counter()
+    items = load()
+    load_time = time.perf_counter() - started
+    started = time.perf_counter()
+    for item in items:
+        serialize(item)
+    dump_time = time.perf_counter() - started
+    del items
+
+    retained, items = traced(load)
+    del items
+    report(label, retained, count, load_time, dump_time)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--storages", type=int, default=24)
+    parser.add_argument("--items-per-storage", type=int, default=4000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    storage = make_storage(args.storages, args.items_per_storage, random.Random(args.seed))
+    count = args.storages * args.items_per_storage
+    # JSON-куски, как при чтении storage_db.json: у каждого товара свои экземпляры строк
+    chunks = [json.dumps(items, ensure_ascii=False) for items in storage["items"].values()]
+
+    print(f"{count} items")
+    print(f"{'store':<12} {'B/item':>10} {'MiB':>10} {'load, s':>9} {'dump, s':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "storage_db.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(storage, f, indent=2)
+        measure_store(path, count)
+    measure_records("Item", lambda data: Item(**data), lambda item: item.dict(), chunks, count)
+    measure_records("ItemRecord", ItemRecord.from_dict, ItemRecord.to_dict, chunks, count)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""Нагрузочный прогон приложения в том же процессе на синтетических данных.
+
+Генерирует данные во временном каталоге, импортирует main оттуда и гоняет app через
+httpx.AsyncClient + ASGITransport: --concurrency виртуальных пользователей в течение
+--duration секунд выполняют сценарии в пропорциях --mix. Фоновые задачи startup
+(sweeper, монитор event loop) при этом не запускаются.
+
+    python benchmarks/load.py --users 50 --items-per-storage 200 --concurrency 20 --duration 30
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+import httpx
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+
+from dataset import PASSWORD, add_arguments, generate_from_args
+from stats import print_table
+
+DEFAULT_MIX = "poll=60,complete=12,receive=10,search=8,login=5,predict=5"
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    async def request(self, client: httpx.AsyncClient, label: str, method: str, url: str, **kwargs):
+        started = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        self.latencies[label].append(time.perf_counter() - started)
+        if response.status_code >= 400:
+            self.errors[label] += 1
+        return response
+
+class VirtualUser:
+    def __init__(self, client: httpx.AsyncClient, recorder: Recorder, username: str, storage_ids, products, rnd):
+        self.client = client
+        self.recorder = recorder
+        self.username = username
+        self.storage_ids = storage_ids
+        self.products = products
+        self.rnd = rnd
+        self.token = None
+
+    async def login(self):
+        response = await self.recorder.request(
+            self.client, "POST /token", "POST", "/api/token",
+            json={"username": self.username, "password": PASSWORD}
+        )
+        if response.status_code == 200:
+            self.token = response.json()["access_token"]
+
+    async def poll(self):
+        """Опрос доски: задачи пользователя, склады, товары одного склада"""
+        await self.recorder.request(self.client, "GET /tasks/{user}", "GET", f"/api/tasks/{self.username}")
+        await self.recorder.request(self.client, "GET /storages", "GET", "/api/storages")
+        await self.recorder.request(
+            self.client, "GET /items", "GET", "/api/items",
+            params={"storage_id": self.rnd.choice(self.storage_ids)}
+        )
+
+    async def complete(self):
+        """Создание задачи со складским действием и ее выполнение"""
+        storage_id = self.rnd.choice(self.storage_ids)
+        response = await self.recorder.request(
+            self.client, "GET /items", "GET", "/api/items", params={"storage_id": storage_id}
+        )
+        items = response.json() if response.status_code == 200 else []
+        if not items:
+            return
+        item = self.rnd.choice(items)
+        action = self.rnd.choice(["sell", "move"])
+        query = {"action": action, "product": item["name"], "count": 1, "storage": storage_id}
+        if action == "move":
+            query["from"] = storage_id
+            query["storage"] = self.rnd.choice([s for s in self.storage_ids if s != storage_id] or self.storage_ids)
+
+        response = await self.recorder.request(
+            self.client, "POST /tasks/", "POST", "/api/tasks/",
+            json={
+                "title": f"Необходимо {action} {item['name']}",
+                "description": "load test",
+                "assigned_to": self.username,
+                "query": json.dumps(query, ensure_ascii=False)
+            }
+        )
+        if response.status_code != 200:
+            return
+        await self.recorder.request(
+            self.client, "PUT /tasks/{task_id}", "PUT", f"/api/tasks/{response.json()['id']}",
+            json={"status": "done"}
+        )
+
+    async def receive(self):
+        """Приемка партии: подбор склада и добавление нескольких товаров"""
+        for _ in range(self.rnd.randint(3, 10)):
+            name, category = self.rnd.choice(self.products)
+            item = {"name": name, "count": self.rnd.randint(1, 20), "category": category}
+            response = await self.recorder.request(
+                self.client, "POST /storages/suggest", "POST", "/api/storages/suggest", json=item
+            )
+            suggestions = response.json() if response.status_code == 200 else []
+            if not suggestions:
+                continue
+            await self.recorder.request(
+                self.client, "POST /storages/{storage_id}/items", "POST",
+                f"/api/storages/{suggestions[0]['storage_id']}/items", json=item
+            )
+
+    async def search(self):
+        name, _ = self.rnd.choice(self.products)
+        await self.recorder.request(self.client, "GET /search", "GET", "/api/search", params={"q": name[:4]})
+        await self.recorder.request(self.client, "GET /storages/summary", "GET", "/api/storages/summary")
+
+    async def predict(self):
+        await self.recorder.request(
+            self.client, "POST /predict", "POST", "/api/predict",
+            json={
+                "farmprice": round(self.rnd.uniform(0.1, 5), 2),
+                "product_code": self.rnd.randint(0, 20),
+                "year": 2025,
+                "month": self.rnd.randint(1, 12),
+                "day": self.rnd.randint(1, 28),
+                "day_of_week": self.rnd.randint(0, 6)
+            }
+        )
+
+def parse_mix(mix: str):
+    weights = {}
+    for part in mix.split(","):
+        name, weight = part.split("=")
+        weights[name.strip()] = float(weight)
+    return weights
+
+def prepare_workdir(directory: str, args):
+    """Каталог, из которого main сможет импортироваться: данные, dist/ и артефакты модели"""
+    database, storage, _ = generate_from_args(directory, args)
+    os.makedirs(os.path.join(directory, "dist", "assets"), exist_ok=True)
+    with open(os.path.join(directory, "dist", "index.html"), 'w') as f:
+        f.write("<html></html>")
+    os.symlink(os.path.join(REPO, "model_artifacts"), os.path.join(directory, "model_artifacts"))
+    return database, storage
+
+async def run(app, args, usernames, storage_ids, products):
+    recorder = Recorder()
+    mix = parse_mix(args.mix)
+    scenarios, weights = list(mix), list(mix.values())
+    transport = httpx.ASGITransport(app=app)
+    deadline = time.perf_counter() + args.duration
+
+    async def virtual_user(index: int):
+        rnd = random.Random(args.seed + index)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            user = VirtualUser(client, recorder, usernames[index % len(usernames)], storage_ids, products, rnd)
+            await user.login()
+            while time.perf_counter() < deadline:
+                await getattr(user, rnd.choices(scenarios, weights)[0])()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(virtual_user(i) for i in range(args.concurrency)))
+    return recorder, time.perf_counter() - started
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"сценарий=вес через запятую (по умолчанию {DEFAULT_MIX})")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        database, storage = prepare_workdir(directory, args)
+        os.chdir(directory)
+        import main as application
+
+        usernames = list(database["users"])
+        storage_ids = [s["id"] for s in storage["storages"]]
+        products = sorted({(item["name"], item["category"]) for items in storage["items"].values() for item in items})
+        recorder, elapsed = asyncio.run(run(application.app, args, usernames, storage_ids, products))
+        os.chdir(REPO)
+
+    total = sum(len(values) for values in recorder.latencies.values())
+    print_table(
+        f"{total} requests in {elapsed:.1f}s, {total / elapsed:.1f} req/s, concurrency {args.concurrency}",
+        recorder.latencies, elapsed, recorder.errors
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Микро-бенчмарки методов StorageDB и TaskDB на синтетических данных.
+
+    python benchmarks/micro.py --items-per-storage 1000 --repeat 200
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dataset import add_arguments, generate_from_args
+from stats import print_table
+from StorageDB import StorageDB, ItemCreate
+from TaskDB import TaskDB, TaskCreate, TaskUpdate
+from TaskExecutor import TaskExecutor
+
+def bench(results: Dict[str, List[float]], name: str, repeat: int, operation: Callable[[int], object]):
+    timings = results.setdefault(name, [])
+    for i in range(repeat):
+        started = time.perf_counter()
+        operation(i)
+        timings.append(time.perf_counter() - started)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    parser.add_argument("--repeat", type=int, default=100)
+    args = parser.parse_args()
+    args.bcrypt_rounds = 4  # пользователи здесь не нужны
+
+    rnd = random.Random(args.seed)
+    results: Dict[str, List[float]] = {}
+    with tempfile.TemporaryDirectory() as directory:
+        generate_from_args(directory, args)
+        storage_path = os.path.join(directory, "storage_db.json")
+        tasks_path = os.path.join(directory, "tasks_db.json")
+
+        bench(results, "StorageDB._load", max(args.repeat // 20, 1), lambda i: StorageDB(storage_path))
+        bench(results, "TaskDB._load", max(args.repeat // 20, 1), lambda i: TaskDB(tasks_path))
+
+        storage_db = StorageDB(storage_path)
+        task_db = TaskDB(tasks_path)
+        executor = TaskExecutor(task_db, storage_db)
+        storage_ids = list(storage_db.storages)
+        names = sorted({item.name for item in storage_db.iter_items()})
+        users = sorted({user for user_tasks in task_db.data.values() for user in user_tasks})
+
+        bench(results, "StorageDB._save", args.repeat, lambda i: storage_db._save())
+        bench(results, "TaskDB._save", args.repeat, lambda i: task_db._save())
+        bench(results, "StorageDB.get_items(storage)", args.repeat, lambda i: storage_db.get_items(rnd.choice(storage_ids)))
+        bench(results, "StorageDB.get_expiring_items(3)", args.repeat, lambda i: storage_db.get_expiring_items(3))
+        bench(results, "StorageDB.get_summary", args.repeat, lambda i: storage_db.get_summary())
+        bench(results, "StorageDB.search_items", args.repeat, lambda i: storage_db.search_items(rnd.choice(names)[:3]))
+        bench(
+            results, "StorageDB.suggest_storages", args.repeat,
+            lambda i: storage_db.suggest_storages(ItemCreate(name=rnd.choice(names), count=5, category="Овощи"))
+        )
+        # bench i: добавляется на случайный склад, переносится на последний и там же продается задачей
+        placed: Dict[int, str] = {}
+
+        def add_item(i: int):
+            placed[i] = rnd.choice(storage_ids[:-1])
+            storage_db.add_item(placed[i], ItemCreate(name=f"bench {i}", count=1))
+
+        bench(results, "StorageDB.add_item", args.repeat, add_item)
+        bench(
+            results, "StorageDB._move_item", args.repeat,
+            lambda i: storage_db._move_item(f"bench {i}", placed[i], storage_ids[-1], 1)
+        )
+        bench(results, "TaskDB.get_user_tasks", args.repeat, lambda i: task_db.get_user_tasks(rnd.choice(users)))
+        bench(results, "TaskDB.search_tasks", args.repeat, lambda i: task_db.search_tasks("необходимо " + rnd.choice(names)[:3]))
+
+        created = []
+        bench(
+            results, "TaskExecutor.create_task", args.repeat,
+            lambda i: created.append(executor.create_task(TaskCreate(
+                title=f"bench {i}", description="", assigned_to=rnd.choice(users),
+                query=json.dumps({"action": "sell", "product": f"bench {i}", "count": 1, "storage": storage_ids[-1]})
+            )))
+        )
+        bench(
+            results, "TaskExecutor.update_task(done)", args.repeat,
+            lambda i: executor.update_task(created[i].id, TaskUpdate(status="done"))
+        )
+
+    print_table(f"store micro-benchmarks ({sum(len(v) for v in storage_db.items.values())} items)", results)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+from typing import Dict, List, Sequence
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(int(round(q / 100 * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+def print_table(title: str, latencies: Dict[str, List[float]], elapsed: float = None, errors: Dict[str, int] = None):
+    """Таблица count / rps / p50 / p95 / p99 (мс) по каждой операции"""
+    errors = errors or {}
+    print(title)
+    header = f"{'operation':<40} {'count':>8} {'errors':>7}"
+    if elapsed:
+        header += f" {'rps':>9}"
+    print(header + f" {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name in sorted(latencies):
+        values = sorted(latencies[name])
+        line = f"{name:<40} {len(values):>8} {errors.get(name, 0):>7}"
+        if elapsed:
+            line += f" {len(values) / elapsed:>9.1f}"
+        print(line + "".join(f" {percentile(values, q) * 1000:>9.2f}" for q in (50, 95, 99)))
@@ -1,4 +1,4 @@
-from fastapi import FastAPI, Depends, HTTPException, status, Body, Header
+from fastapi import FastAPI, Depends, HTTPException, status, Body, Header, Query
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from pydantic import BaseModel
 from datetime import datetime, timedelta
@@ -9,11 +9,17 @@ from fastapi.middleware.cors import CORSMiddleware
 from FileDatabase import FileDatabase
 from TaskDB import TaskDB, Task, TaskCreate, TaskUpdate, TaskMove
 from typing import List, Optional, Dict
-from StorageDB import StorageDB, Item, Storage, ItemCreate, ItemUpdate
+from StorageDB import StorageDB, Item, Storage, ItemCreate, ItemUpdate, InventorySummary, PlacementSuggestion
 from model import PricePredictor
-import json
+from ExpirationSweeper import ExpirationSweeper
+from TaskExecutor import TaskExecutor
+from ResponseCache import ResponseCache
+from Metrics import metrics, MetricsMiddleware, monitor_event_loop_lag
+from Profiler import ProfileStore, ProfilingMiddleware
+import asyncio
+import os
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, PlainTextResponse
 
 
 predictor = PricePredictor()
@@ -25,7 +31,34 @@ task_db = TaskDB()
 storage_db = StorageDB()
 storage_db.init_storages()
 
+task_executor = TaskExecutor(task_db, storage_db)
+
+# Горячие GET-ответы сериализуются один раз на версию хранилища
+response_cache = ResponseCache()
+
+metrics.callback("response_cache_hits_total", "Hot GET responses served from cache", "counter", lambda: response_cache.hits)
+metrics.callback("response_cache_misses_total", "Hot GET responses serialized on request", "counter", lambda: response_cache.misses)
+metrics.callback(
+    "response_cache_hit_ratio", "Share of hot GET responses served from cache", "gauge",
+    lambda: response_cache.hits / max(response_cache.hits + response_cache.misses, 1)
+)
+
+def expiration_sweep_assignee() -> Optional[str]:
+    assignee = os.getenv("EXPIRATION_SWEEP_ASSIGNEE")
+    if assignee:
+        return assignee
+    managers = db.get_all_managers()['users']
+    return managers[0] if managers else None
+
+expiration_sweeper = ExpirationSweeper(
+    storage_db,
+    task_db,
+    assignee=expiration_sweep_assignee,
+    within_days=float(os.getenv("EXPIRATION_SWEEP_DAYS", "3"))
+)
+
 api = FastAPI()
+api.add_middleware(MetricsMiddleware)
 
 SECRET_KEY = "my-secret-key"  
 ALGORITHM = "HS256"
@@ -63,6 +96,22 @@ app = FastAPI()
 # Раздача статики (JS, CSS, изображения)
 app.mount("/assets", StaticFiles(directory="dist/assets"), name="assets")
 
+@app.on_event("startup")
+async def start_expiration_sweeper():
+    expiration_sweeper.start()
+
+@app.on_event("shutdown")
+async def stop_expiration_sweeper():
+    await expiration_sweeper.stop()
+
+@app.on_event("startup")
+async def start_event_loop_monitor():
+    app.state.event_loop_monitor = asyncio.create_task(monitor_event_loop_lag())
+
+@app.on_event("shutdown")
+async def stop_event_loop_monitor():
+    app.state.event_loop_monitor.cancel()
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -255,7 +304,10 @@ async def validate_token(authorization: str = Header(...)):
 
 @api.post("/tasks/", response_model=Task)
 async def create_task(task_data: TaskCreate = Body(...)):
-    return task_db.create_task(task_data)
+    try:
+        return task_executor.create_task(task_data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @api.get("/tasks/", response_model=Dict[str, Dict[str, List[Task]]])
 async def get_all_tasks():
@@ -263,41 +315,27 @@ async def get_all_tasks():
 
 @api.get("/tasks/{user}", response_model=Dict[str, List[Task]])
 async def get_user_tasks(user: str):
-    return task_db.get_user_tasks(user)
+    return response_cache.response(
+        ("tasks", user),
+        task_db.version,
+        lambda: {
+            status: [task.dict() for task in tasks]
+            for status, tasks in task_db.get_user_tasks(user).items()
+        }
+    )
 
 @api.put("/tasks/{task_id}", response_model=Task)
 async def update_task(
     task_id: str, 
     update_data: TaskUpdate = Body(...)
 ):
-    task = task_db.update_task(task_id, update_data)
+    try:
+        task = task_executor.update_task(task_id, update_data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
-    
-
-    if update_data.status == 'done':
-        if task.query != None: 
-            data = json.loads(task.query)
-
-            if data['action'] == 'sell':
-                for item in storage_db.get_items(data['storage']):
-                    if item.name == data['product']:
-                        item.count-= data['count']
-
-                        if item.count <= 0:
-                            storage_db.delete_item(data['product'], data['storage'])
-                        else:
-                            storage_db.update_item(data['product'], data['storage'], item)
-                
-            if data['action'] == 'add':
-                storage_db.add_item(data['storage'], ItemCreate(name= data['product'], count= data['count']))
-            if data['action'] == 'move':
-                storage_db._move_item(data['product'], data['from'], data['storage'], data['count'])
-
-
-
-
 
     return task
 
@@ -306,11 +344,14 @@ async def move_task(
     task_id: str,
     move_data: TaskMove = Body(...)
 ):
-    update_data = TaskUpdate(
-        status=move_data.new_status,
-        assigned_to=move_data.new_assignee
-    )
-    task = task_db.update_task(task_id, update_data)
+    update_data = TaskUpdate(status=move_data.new_status)
+    if move_data.new_assignee:
+        update_data.assigned_to = move_data.new_assignee
+    # Перенос на доске - то же изменение статуса, что и PUT: проверка query и складские действия
+    try:
+        task = task_executor.update_task(task_id, update_data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     return task
@@ -319,6 +360,7 @@ async def move_task(
 async def delete_task(task_id: str):
     if not task_db.delete_task(task_id):
         raise HTTPException(status_code=404, detail="Task not found")
+    task_executor.forget(task_id)
     return {"message": "Task deleted successfully"}
 
 
@@ -331,11 +373,22 @@ async def add_item(storage_id: str, item_data: ItemCreate = Body(...)):
 
 @api.get("/items", response_model=List[Item])
 async def get_items(storage_id: Optional[str] = None):
-    return storage_db.get_items(storage_id)
+    return response_cache.response(
+        ("items", storage_id),
+        storage_db.version,
+        lambda: [item.to_dict() for item in storage_db.iter_items(storage_id)]
+    )
+
+@api.get("/items/expiring", response_model=List[Item])
+async def get_expiring_items(within_days: int = Query(7, ge=0, le=3650), storage_id: Optional[str] = None):
+    return storage_db.get_expiring_items(within_days, storage_id)
 
 @api.put("/items/{storage_id}/{item_name}", response_model=Item)
 async def update_item(item_name: str, storage_id:str, update_data: ItemUpdate = Body(...)):
-    item = storage_db.update_item(item_name, storage_id, update_data)
+    try:
+        item = storage_db.update_item(item_name, storage_id, update_data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     if not item:
         raise HTTPException(status_code=404, detail="Товар не найден")
     return item
@@ -348,7 +401,74 @@ async def delete_item(item_id: str):
 
 @api.get("/storages", response_model=Dict[str, Storage])
 async def get_storages():
-    return storage_db.storages
+    return response_cache.response(
+        "storages",
+        storage_db.version,
+        lambda: {storage_id: storage.dict() for storage_id, storage in storage_db.storages.items()}
+    )
+
+@api.get("/storages/summary", response_model=InventorySummary)
+async def get_storages_summary():
+    return storage_db.get_summary()
+
+@api.post("/storages/suggest", response_model=List[PlacementSuggestion])
+async def suggest_storages(item_data: ItemCreate = Body(...), limit: int = Query(5, ge=1, le=100)):
+    return storage_db.suggest_storages(item_data, limit)
+
+
+def is_manager_authorization(authorization: Optional[str]) -> bool:
+    if not authorization or not authorization.startswith("Bearer "):
+        return False
+    try:
+        payload = jwt.decode(authorization.split(" ")[1], SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return False
+    user = get_user(payload.get("sub")) if payload.get("sub") else None
+    return bool(user and user.is_manager and not user.disabled)
+
+# Профили запросов: по заголовку X-Profile (только менеджеры) и для запросов дольше PROFILE_SLOW_MS
+profile_store = ProfileStore(
+    os.getenv("PROFILE_DIR", "profiles"),
+    max_files=int(os.getenv("PROFILE_MAX_FILES", "50"))
+)
+api.add_middleware(
+    ProfilingMiddleware,
+    store=profile_store,
+    authorize=is_manager_authorization,
+    slow_threshold=float(os.environ["PROFILE_SLOW_MS"]) / 1000 if os.getenv("PROFILE_SLOW_MS") else None
+)
+
+async def get_current_manager(current_user: User = Depends(get_current_active_user)):
+    if not current_user.is_manager:
+        raise HTTPException(status_code=403, detail="Manager access required")
+    return current_user
+
+@api.get("/admin/profiles")
+async def list_profiles(current_user: User = Depends(get_current_manager)):
+    return profile_store.list()
+
+@api.get("/admin/profiles/{name}", response_class=PlainTextResponse)
+async def get_profile(name: str, current_user: User = Depends(get_current_manager)):
+    content = profile_store.read(name)
+    if content is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(content)
+
+@api.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+class SearchResults(BaseModel):
+    items: List[Item]
+    tasks: List[Task]
+
+@api.get("/search", response_model=SearchResults)
+async def search(q: str, limit: int = Query(20, ge=1, le=100)):
+    return SearchResults(
+        items=storage_db.search_items(q, limit),
+        tasks=task_db.search_tasks(q, limit)
+    )
 
 
 class Prediction(BaseModel):
@@ -4,6 +4,9 @@ import tensorflow as tf
 from tensorflow.keras.models import load_model
 import joblib
 import os
+import time
+
+from Metrics import PREDICT_SECONDS
 
 
 class PricePredictor:
@@ -46,6 +49,7 @@ class PricePredictor:
             raise RuntimeError("Please load artifacts first with load()")
             
         try:
+            started = time.perf_counter()
             input_df = pd.DataFrame([input_data])
             
             missing = set(self.features) - set(input_df.columns)
@@ -58,8 +62,10 @@ class PricePredictor:
             scaled = self.scaler.transform(input_df[self.features[:-1]])
             encoded = self.encoder.transform(input_df[['product_code']]).toarray()
             final_input = np.concatenate([scaled, encoded], axis=1)
-            
-            return float(self.model.predict(final_input)[0][0])
+            PREDICT_SECONDS.labels("preprocess").observe(time.perf_counter() - started)
+
+            with PREDICT_SECONDS.labels("model").time():
+                return float(self.model.predict(final_input)[0][0])
             
         except Exception as e:
             print(f"Prediction failed: {str(e)}")